@@ -0,0 +1,471 @@
+"""
+Concurrency and load driver for the climate data utility context.
+
+Starts several Beaker kernels, one per simulated notebook, sets up the climate data utility context in each and
+sends `download_dataset_request` and `save_dataset_request` messages from all of them at once against an HMI server.
+A synthetic netcdf file of the requested size is uploaded to the server first. Unless `--hmi-server` is given,
+a local mock HMI server is started with the requested latency, bandwidth and error injection.
+
+Reports throughput, latency percentiles per request type and the peak memory of the kernels and their subkernels.
+Beaker creates subkernels through the Jupyter server REST API, so a Jupyter server is required, given by
+`--jupyter-server` or the JUPYTER_SERVER environment variable. Subkernel memory is only measured when that server
+runs on the same machine as the driver.
+
+Usage:
+    JUPYTER_SERVER=http://localhost:8888 JUPYTER_TOKEN=<token> \
+    python loadtest/load_driver.py --notebooks 4 --iterations 5 --file-size-mb 200 --latency 0.1 --error-rate 0.05
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+import requests
+import xarray as xr
+from jupyter_client import KernelManager
+
+from mock_hmi_server import MockHMIServer, add_config_arguments, config_from_arguments
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_JSON = Path(__file__).resolve().parent.parent / "context.json"
+
+# Credentials sent to the HMI server; the mock server does not check them.
+HMI_SERVER_USER = "loadtest"
+HMI_SERVER_PASSWORD = "loadtest"
+
+
+@dataclass
+class RequestResult:
+    notebook: int
+    request_type: str
+    started: float
+    latency: float
+    ok: bool
+    error: str = None
+
+
+def synthetic_netcdf(size_mb: float) -> bytes:
+    """
+    Build a netcdf file of roughly `size_mb` megabytes with a 0.25 degree global grid.
+    """
+    lats = np.arange(-90, 90, 0.25) + 0.125
+    lons = np.arange(-180, 180, 0.25) + 0.125
+    step_bytes = lats.size * lons.size * np.dtype("float32").itemsize
+    times = max(1, math.ceil(size_mb * 1e6 / step_bytes))
+
+    random_generator = np.random.default_rng(0)
+    values = random_generator.standard_normal((times, lats.size, lons.size), dtype="float32")
+    dataset = xr.Dataset(
+        {"tas": (("time", "lat", "lon"), values, {"units": "K", "long_name": "Synthetic air temperature"})},
+        coords={"time": np.arange(times), "lat": lats, "lon": lons},
+    )
+    return dataset.to_netcdf()
+
+
+def seed_dataset(hmi_server: str, data: bytes, filename: str) -> str:
+    """
+    Create a dataset on the HMI server and upload `data` to it.
+
+    Returns:
+        str: The id of the created dataset.
+    """
+    auth = (HMI_SERVER_USER, HMI_SERVER_PASSWORD)
+    response = requests.post(f"{hmi_server}/datasets", json={"name": "loadtest seed", "fileNames": [filename]}, auth=auth)
+    response.raise_for_status()
+    dataset_id = response.json()["id"]
+
+    response = requests.put(
+        f"{hmi_server}/datasets/{dataset_id}/upload-file",
+        data={"id": dataset_id, "filename": filename},
+        files={"file": data},
+        auth=auth,
+    )
+    response.raise_for_status()
+    return dataset_id
+
+
+class JupyterServer:
+    """The Jupyter server Beaker creates subkernels on."""
+
+    def __init__(self, url: str, token: str = None):
+        self.url = url.rstrip("/")
+        self.token = token
+
+    def kernel_ids(self) -> set:
+        headers = {"Authorization": f"token {self.token}"} if self.token else {}
+        response = requests.get(f"{self.url}/api/kernels", headers=headers)
+        response.raise_for_status()
+        return {kernel["id"] for kernel in response.json()}
+
+
+def kernel_pids(kernel_ids) -> dict:
+    """
+    Find the local processes of Jupyter server kernels from the connection files on their command lines.
+
+    Returns:
+        dict: Mapping of kernel id to process id, for the kernels running on this machine.
+    """
+    connection_files = {f"kernel-{kernel_id}.json": kernel_id for kernel_id in kernel_ids}
+    pids = {}
+    for process in psutil.process_iter(["cmdline"]):
+        for argument in process.info["cmdline"] or []:
+            kernel_id = connection_files.get(os.path.basename(argument))
+            if kernel_id is not None:
+                pids[kernel_id] = process.pid
+    return pids
+
+
+class Notebook:
+    """A Beaker kernel running the climate data utility context, driven through the Jupyter protocol."""
+
+    def __init__(self, index: int, kernel_name: str, hmi_server: str, jupyter_server: JupyterServer):
+        self.index = index
+        self.manager = KernelManager(kernel_name=kernel_name)
+        self.hmi_server = hmi_server
+        self.jupyter_server = jupyter_server
+        self.client = None
+        self.subkernel_ids = set()
+
+    def start(self, context: str, language: str, timeout: float):
+        env = dict(os.environ)
+        env.update(
+            {
+                "HMI_SERVER": self.hmi_server,
+                "HMI_SERVER_USER": HMI_SERVER_USER,
+                "HMI_SERVER_PASSWORD": HMI_SERVER_PASSWORD,
+                "JUPYTER_SERVER": self.jupyter_server.url,
+            }
+        )
+        if self.jupyter_server.token:
+            env["JUPYTER_TOKEN"] = self.jupyter_server.token
+
+        # Notebooks are started one at a time, so the kernels that appear on the Jupyter server meanwhile are the
+        # subkernels of this notebook.
+        existing_kernel_ids = self.jupyter_server.kernel_ids()
+        self.manager.start_kernel(env=env)
+        self.client = self.manager.client()
+        self.client.start_channels()
+        self.client.wait_for_ready(timeout=timeout)
+
+        self.request(
+            "context_setup_request",
+            {"context": context, "language": language, "context_info": {}},
+            "context_setup_response",
+            timeout,
+        )
+        self.subkernel_ids = self.jupyter_server.kernel_ids() - existing_kernel_ids
+
+    def stop(self):
+        if self.client is not None:
+            self.client.stop_channels()
+        self.manager.shutdown_kernel(now=True)
+
+    @property
+    def pid(self):
+        return self.manager.provisioner.pid if self.manager.provisioner else None
+
+    def pids(self) -> list:
+        """
+        The process ids of the kernel and of its subkernels that run on this machine.
+        """
+        subkernel_pids = kernel_pids(self.subkernel_ids)
+        missing = self.subkernel_ids - set(subkernel_pids)
+        if missing:
+            logger.warning(f"Subkernels {sorted(missing)} of notebook {self.index} are not running on this machine")
+        return [pid for pid in [self.pid, *subkernel_pids.values()] if pid is not None]
+
+    def request(self, msg_type: str, content: dict, response_type: str, timeout: float) -> dict:
+        """
+        Send a custom message to the kernel and wait for its response on iopub.
+
+        Returns:
+            dict: The content of the response message.
+        """
+        message = self.client.session.msg(msg_type, content)
+        self.client.shell_channel.send(message)
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"No {response_type} within {timeout} seconds")
+            try:
+                response = self.client.get_iopub_msg(timeout=remaining)
+            except queue.Empty:
+                continue
+            # Match on the parent so that a late response to an earlier, timed out request is ignored.
+            is_reply = response["parent_header"].get("msg_id") == message["header"]["msg_id"]
+            if response["msg_type"] == response_type and is_reply:
+                return response["content"]
+
+
+class MemorySampler(threading.Thread):
+    """Samples the resident memory of each kernel process and its subkernels to record their peaks."""
+
+    def __init__(self, notebooks: list, interval: float = 0.25):
+        super().__init__(name="memory-sampler", daemon=True)
+        self.notebooks = notebooks
+        self.pids = {notebook.index: notebook.pids() for notebook in notebooks}
+        self.interval = interval
+        self.peak_total = 0
+        self.peak_per_notebook = {notebook.index: 0 for notebook in notebooks}
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            total = 0
+            for notebook in self.notebooks:
+                rss = process_tree_rss(self.pids[notebook.index])
+                total += rss
+                self.peak_per_notebook[notebook.index] = max(self.peak_per_notebook[notebook.index], rss)
+            self.peak_total = max(self.peak_total, total)
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def process_tree_rss(pids: list) -> int:
+    """
+    The resident memory of the processes and all of their children, counting each process once.
+    """
+    processes = {}
+    for pid in pids:
+        try:
+            process = psutil.Process(pid)
+            for child in [process, *process.children(recursive=True)]:
+                processes[child.pid] = child
+        except psutil.NoSuchProcess:
+            pass
+
+    rss = 0
+    for process in processes.values():
+        try:
+            rss += process.memory_info().rss
+        except psutil.NoSuchProcess:
+            pass
+    return rss
+
+
+def run_notebook(notebook: Notebook, dataset_id: str, filename: str, iterations: int, timeout: float, results: list):
+    """
+    Download the seed dataset into the notebook and save it back to the HMI server, `iterations` times.
+    """
+    requests_to_send = [
+        ("download_dataset_request", "download_dataset_response", lambda _: {"uuid": dataset_id, "filename": filename}),
+        (
+            "save_dataset_request",
+            "save_dataset_response",
+            lambda iteration: {"dataset": "dataset", "filename": f"loadtest-{notebook.index}-{iteration}.nc"},
+        ),
+    ]
+    for iteration in range(iterations):
+        for msg_type, response_type, content in requests_to_send:
+            started = time.monotonic()
+            try:
+                response = notebook.request(msg_type, content(iteration), response_type, timeout)
+                error = response_error(response)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            results.append(
+                RequestResult(
+                    notebook=notebook.index,
+                    request_type=msg_type,
+                    started=started,
+                    latency=time.monotonic() - started,
+                    ok=error is None,
+                    error=error,
+                )
+            )
+
+
+def response_error(response: dict):
+    """
+    Extract the failure message from a download_dataset_response or save_dataset_response, if any.
+    """
+    if response.get("status") == "error":
+        return response.get("error") or "Request failed"
+    if response.get("status") != "ok":
+        return f"Response has no status: {response}"
+    if "file_upload_status" in response and response["file_upload_status"] is None:
+        return "Dataset saved without a file upload status"
+    return None
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+def build_report(results: list, wall_time: float, file_size: int, server_stats: dict, sampler: MemorySampler) -> dict:
+    report = {
+        "wall_time_seconds": round(wall_time, 3),
+        "file_size_bytes": file_size,
+        "requests": {},
+    }
+
+    for request_type in sorted({result.request_type for result in results}):
+        typed_results = [result for result in results if result.request_type == request_type]
+        latencies = [result.latency for result in typed_results if result.ok]
+        succeeded = len(latencies)
+        summary = {
+            "count": len(typed_results),
+            "succeeded": succeeded,
+            "failed": len(typed_results) - succeeded,
+            "requests_per_second": round(succeeded / wall_time, 3),
+            "file_throughput_mb_per_second": round(succeeded * file_size / wall_time / 1e6, 3),
+            "errors": sorted({result.error for result in typed_results if result.error}),
+        }
+        if latencies:
+            summary["latency_seconds"] = {
+                "p50": round(percentile(latencies, 0.5), 3),
+                "p90": round(percentile(latencies, 0.9), 3),
+                "p99": round(percentile(latencies, 0.99), 3),
+                "max": round(max(latencies), 3),
+            }
+        report["requests"][request_type] = summary
+
+    if server_stats:
+        report["server"] = server_stats
+        report["server_throughput_mb_per_second"] = round(
+            (server_stats["bytes_sent"] + server_stats["bytes_received"]) / wall_time / 1e6, 3
+        )
+
+    if sampler is not None:
+        report["kernel_peak_memory_mb"] = {
+            "total": round(sampler.peak_total / 1e6, 1),
+            "per_notebook": {index: round(peak / 1e6, 1) for index, peak in sampler.peak_per_notebook.items()},
+        }
+
+    return report
+
+
+def print_report(report: dict):
+    print(f"Wall time: {report['wall_time_seconds']} s, file size: {report['file_size_bytes'] / 1e6:.1f} MB")
+    for request_type, summary in report["requests"].items():
+        print(f"\n{request_type}: {summary['succeeded']}/{summary['count']} succeeded")
+        print(f"  {summary['requests_per_second']} requests/s, {summary['file_throughput_mb_per_second']} MB/s of files")
+        latency = summary.get("latency_seconds")
+        if latency:
+            print(f"  latency p50={latency['p50']}s p90={latency['p90']}s p99={latency['p99']}s max={latency['max']}s")
+        for error in summary["errors"]:
+            print(f"  error: {error}")
+    if "server" in report:
+        print(f"\nHMI server throughput: {report['server_throughput_mb_per_second']} MB/s")
+        print(f"HMI server injected errors: {report['server']['injected_errors']}")
+    if "kernel_peak_memory_mb" in report:
+        print(f"\nKernel peak memory: {report['kernel_peak_memory_mb']['total']} MB total")
+        for index, peak in report["kernel_peak_memory_mb"]["per_notebook"].items():
+            print(f"  notebook {index}: {peak} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notebooks", type=int, default=4, help="Number of concurrent notebooks (kernels).")
+    parser.add_argument("--iterations", type=int, default=3, help="Download and save cycles per notebook.")
+    parser.add_argument("--file-size-mb", type=float, default=100, help="Size of the synthetic netcdf file.")
+    parser.add_argument("--hmi-server", default=None, help="URL of an HMI server to use instead of the mock server.")
+    parser.add_argument(
+        "--jupyter-server",
+        default=os.getenv("JUPYTER_SERVER"),
+        help="URL of the Jupyter server running the subkernels. Defaults to the JUPYTER_SERVER environment variable.",
+    )
+    parser.add_argument(
+        "--jupyter-token",
+        default=os.getenv("JUPYTER_TOKEN"),
+        help="Token of the Jupyter server. Defaults to the JUPYTER_TOKEN environment variable.",
+    )
+    parser.add_argument("--kernel-name", default="beaker_kernel")
+    parser.add_argument("--context", default=None, help="Context slug. Defaults to the slug in context.json.")
+    parser.add_argument("--language", default="python3")
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds to wait for each response.")
+    parser.add_argument("--report", default=None, help="Path to write the report to as JSON.")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    if not args.jupyter_server:
+        parser.error("A Jupyter server is required to run subkernels, set --jupyter-server or JUPYTER_SERVER.")
+
+    logging.basicConfig(level=logging.INFO)
+    jupyter_server = JupyterServer(args.jupyter_server, args.jupyter_token)
+    context = args.context or json.loads(CONTEXT_JSON.read_text())["slug"]
+
+    server = None
+    hmi_server = args.hmi_server
+    if hmi_server is None:
+        server = MockHMIServer(("127.0.0.1", 0), config_from_arguments(args))
+        server.start()
+        hmi_server = server.url
+        logger.info(f"Started mock HMI server at {hmi_server}")
+
+    filename = "loadtest.nc"
+    logger.info(f"Generating a {args.file_size_mb} MB synthetic dataset")
+    data = synthetic_netcdf(args.file_size_mb)
+    if server is not None:
+        # Seed the mock server directly so that seeding is not throttled, failed or counted in its statistics.
+        dataset_id = server.add_file(filename, data)
+    else:
+        dataset_id = seed_dataset(hmi_server, data, filename)
+
+    notebooks = [Notebook(index, args.kernel_name, hmi_server, jupyter_server) for index in range(args.notebooks)]
+    sampler = None
+    try:
+        logger.info(f"Starting {args.notebooks} kernels with the {context} context")
+        for notebook in notebooks:
+            notebook.start(context, args.language, args.timeout)
+
+        if psutil is not None:
+            sampler = MemorySampler(notebooks)
+            sampler.start()
+        else:
+            logger.warning("psutil is not installed, kernel memory will not be reported")
+
+        results = []
+        start = time.monotonic()
+        threads = [
+            threading.Thread(
+                target=run_notebook,
+                args=(notebook, dataset_id, filename, args.iterations, args.timeout, results),
+                name=f"notebook-{notebook.index}",
+            )
+            for notebook in notebooks
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall_time = time.monotonic() - start
+
+        if sampler is not None:
+            sampler.stop()
+
+        server_stats = server.state.stats() if server is not None else None
+        report = build_report(results, wall_time, len(data), server_stats, sampler)
+        print_report(report)
+        if args.report:
+            Path(args.report).write_text(
+                json.dumps({**report, "results": [asdict(result) for result in results]}, indent=2)
+            )
+    finally:
+        for notebook in notebooks:
+            notebook.stop()
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+Local mock of the HMI server dataset endpoints used by the climate data utility context.
+
+Implements `POST /datasets`, `PUT /datasets/{id}/upload-file` and `GET /datasets/{id}/download-file`, with
+configurable latency, bandwidth and error injection so the context can be exercised against a slow or flaky server.
+`GET /_stats` reports request counts and transferred bytes.
+
+Usage:
+    python loadtest/mock_hmi_server.py --port 8001 --latency 0.2 --bandwidth-mbps 50 --error-rate 0.05
+"""
+import argparse
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+UPLOAD_PATH = re.compile(r"^/datasets/(?P<id>[^/]+)/upload-file$")
+DOWNLOAD_PATH = re.compile(r"^/datasets/(?P<id>[^/]+)/download-file$")
+DATASET_PATH = re.compile(r"^/datasets/(?P<id>[^/]+)$")
+
+
+@dataclass
+class MockHMIConfig:
+    """Behaviour of the mock server."""
+
+    # Fixed delay added to every request, in seconds.
+    latency: float = 0.0
+    # Random extra delay of up to this many seconds added to every request.
+    jitter: float = 0.0
+    # Transfer rate for request and response bodies in bytes per second. Zero means unlimited.
+    bandwidth: float = 0.0
+    # Fraction of requests that fail with `error_status`.
+    error_rate: float = 0.0
+    error_status: int = 500
+    seed: int = None
+
+
+@dataclass
+class MockHMIState:
+    """Datasets and request statistics held by the mock server."""
+
+    datasets: dict = field(default_factory=dict)
+    requests: Counter = field(default_factory=Counter)
+    injected_errors: Counter = field(default_factory=Counter)
+    bytes_received: int = 0
+    bytes_sent: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "datasets": len(self.datasets),
+                "requests": dict(self.requests),
+                "injected_errors": dict(self.injected_errors),
+                "bytes_received": self.bytes_received,
+                "bytes_sent": self.bytes_sent,
+            }
+
+
+class MockHMIRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def config(self) -> MockHMIConfig:
+        return self.server.config
+
+    @property
+    def state(self) -> MockHMIState:
+        return self.server.state
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/_stats":
+            self.send_json(200, self.state.stats())
+        elif DOWNLOAD_PATH.match(path):
+            self.handle_request("download-file", self.download_file, DOWNLOAD_PATH.match(path)["id"])
+        elif DATASET_PATH.match(path):
+            self.handle_request("get-dataset", self.get_dataset, DATASET_PATH.match(path)["id"])
+        else:
+            self.send_json(404, {"error": f"Unknown path {path}"})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if path == "/datasets":
+            self.handle_request("create-dataset", self.create_dataset)
+        else:
+            self.send_json(404, {"error": f"Unknown path {path}"})
+
+    def do_PUT(self):
+        path = urlparse(self.path).path
+        if UPLOAD_PATH.match(path):
+            self.handle_request("upload-file", self.upload_file, UPLOAD_PATH.match(path)["id"])
+        else:
+            self.send_json(404, {"error": f"Unknown path {path}"})
+
+    def handle_request(self, endpoint, handler, *args):
+        """
+        Apply the configured latency and error injection, then run the endpoint handler.
+        """
+        with self.state.lock:
+            self.state.requests[endpoint] += 1
+            random_generator = self.server.random
+            delay = self.config.latency + random_generator.uniform(0, self.config.jitter)
+            inject_error = random_generator.random() < self.config.error_rate
+
+        time.sleep(delay)
+        body = self.read_body()
+
+        if inject_error:
+            with self.state.lock:
+                self.state.injected_errors[endpoint] += 1
+            self.send_json(self.config.error_status, {"error": f"Injected failure for {endpoint}"})
+            return
+
+        handler(body, *args)
+
+    def create_dataset(self, body):
+        dataset_id = str(uuid.uuid4())
+        metadata = json.loads(body or b"{}")
+        metadata["id"] = dataset_id
+        with self.state.lock:
+            self.state.datasets[dataset_id] = {"metadata": metadata, "files": {}}
+        self.send_json(201, metadata)
+
+    def get_dataset(self, _body, dataset_id):
+        with self.state.lock:
+            dataset = self.state.datasets.get(dataset_id)
+        if dataset is None:
+            self.send_json(404, {"error": f"Dataset {dataset_id} not found"})
+            return
+        self.send_json(200, dataset["metadata"])
+
+    def upload_file(self, body, dataset_id):
+        fields = parse_multipart(self.headers.get("Content-Type", ""), body)
+        file_bytes = fields.get("file")
+        filename = fields.get("filename", b"").decode() or parse_qs(urlparse(self.path).query).get("filename", [""])[0]
+        if file_bytes is None or not filename:
+            self.send_json(400, {"error": "Expected multipart form data with 'file' and 'filename' fields"})
+            return
+
+        with self.state.lock:
+            dataset = self.state.datasets.get(dataset_id)
+            if dataset is not None:
+                dataset["files"][filename] = file_bytes
+        if dataset is None:
+            self.send_json(404, {"error": f"Dataset {dataset_id} not found"})
+            return
+        self.send_json(200, {"id": dataset_id, "filename": filename, "size": len(file_bytes)})
+
+    def download_file(self, _body, dataset_id):
+        filename = parse_qs(urlparse(self.path).query).get("filename", [""])[0]
+        with self.state.lock:
+            file_bytes = self.state.datasets.get(dataset_id, {}).get("files", {}).get(filename)
+        if file_bytes is None:
+            self.send_json(404, {"error": f"File {filename} not found for dataset {dataset_id}"})
+            return
+        self.send_bytes(200, file_bytes, "application/octet-stream")
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        chunks = []
+        remaining = length
+        while remaining > 0:
+            chunk = self.rfile.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+            self.throttle(len(chunk))
+        with self.state.lock:
+            self.state.bytes_received += length - remaining
+        return b"".join(chunks)
+
+    def send_json(self, status, content):
+        self.send_bytes(status, json.dumps(content).encode(), "application/json")
+
+    def send_bytes(self, status, data, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        for offset in range(0, len(data), CHUNK_SIZE):
+            chunk = data[offset : offset + CHUNK_SIZE]
+            self.wfile.write(chunk)
+            self.throttle(len(chunk))
+        with self.state.lock:
+            self.state.bytes_sent += len(data)
+
+    def throttle(self, size):
+        if self.config.bandwidth > 0:
+            time.sleep(size / self.config.bandwidth)
+
+
+def _find_delimiter(body, delimiter, start):
+    """
+    Find the next line that is a boundary delimiter, i.e. the delimiter followed by a line break or `--`.
+    """
+    position = body.find(b"\r\n" + delimiter, start)
+    while position != -1:
+        following = body[position + 2 + len(delimiter) : position + 4 + len(delimiter)]
+        if following in (b"\r\n", b"--"):
+            return position
+        position = body.find(b"\r\n" + delimiter, position + 2)
+    return position
+
+
+def parse_multipart(content_type, body):
+    """
+    Parse a multipart/form-data body into a mapping of field names to their raw bytes.
+    Parts are located by searching for the boundary in the body, so each file is copied only once.
+    """
+    boundary = re.search(r'boundary="?([^";]+)"?', content_type)
+    if not content_type.startswith("multipart/form-data") or boundary is None:
+        return {}
+
+    delimiter = b"--" + boundary[1].encode()
+    fields = {}
+    position = body.find(delimiter)
+    while position != -1:
+        part_start = position + len(delimiter)
+        if body.startswith(b"--", part_start):
+            break
+        part_end = _find_delimiter(body, delimiter, part_start)
+        if part_end == -1:
+            break
+        headers_end = body.find(b"\r\n\r\n", part_start, part_end)
+        if headers_end != -1:
+            name = re.search(r'[;\s]name="([^"]*)"', body[part_start:headers_end].decode("latin-1"))
+            if name is not None:
+                fields[name[1]] = body[headers_end + 4 : part_end]
+        position = part_end + 2
+    return fields
+
+
+class MockHMIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: MockHMIConfig = None):
+        super().__init__(address, MockHMIRequestHandler)
+        self.config = config or MockHMIConfig()
+        self.state = MockHMIState()
+        self.random = random.Random(self.config.seed)
+
+    def add_file(self, filename: str, data: bytes) -> str:
+        """
+        Store a file in a new dataset without going through HTTP.
+
+        Returns:
+            str: The id of the created dataset.
+        """
+        dataset_id = str(uuid.uuid4())
+        with self.state.lock:
+            self.state.datasets[dataset_id] = {
+                "metadata": {"id": dataset_id, "fileNames": [filename]},
+                "files": {filename: data},
+            }
+        return dataset_id
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """
+        Serve requests from a background thread.
+        """
+        thread = threading.Thread(target=self.serve_forever, name="mock-hmi-server", daemon=True)
+        thread.start()
+        return thread
+
+
+def add_config_arguments(parser):
+    parser.add_argument("--latency", type=float, default=0.0, help="Fixed delay per request in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra delay per request of up to this many seconds.")
+    parser.add_argument("--bandwidth-mbps", type=float, default=0.0, help="Transfer rate in megabytes per second, 0 for unlimited.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail.")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status code of injected failures.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for latency jitter and error injection.")
+
+
+def config_from_arguments(args):
+    return MockHMIConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        bandwidth=args.bandwidth_mbps * 1e6,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = MockHMIServer((args.host, args.port), config_from_arguments(args))
+    logger.info(f"Mock HMI server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
+import ast
 import json
+import keyword
 import logging
 import re
+import time
 from typing import Optional
 import codecs
 
@@ -17,6 +20,136 @@ from beaker_kernel.lib.context import BaseContext
 
 logger = logging.getLogger(__name__)
 
+# Name the result of a procedure is bound to inside the scope it runs in.
+PROCEDURE_RESULT = "__procedure_result__"
+
+
+def procedure_definitions(code: str) -> str:
+    """
+    Drop the final statement of procedure code, keeping the imports and functions it defines so that another
+    procedure can be appended to reuse them.
+    """
+    final = ast.parse(code).body[-1]
+    return "\n".join(code.splitlines()[: final.lineno - 1]).rstrip()
+
+
+def is_variable_name(name: str) -> bool:
+    return name.isidentifier() and not keyword.iskeyword(name)
+
+
+def bind_result(code: str, variable_name: str) -> str:
+    """
+    Rewrite procedure code so that its result is bound to a variable in the notebook instead of being displayed.
+
+    The procedure runs in a copy of the notebook namespace, so the only name it writes back to the notebook is the
+    result variable. Any existing value of the variable is removed first, so an earlier value can never be mistaken
+    for the new result. Plotting procedures end by showing their figure, so a trailing `plt.show()` is replaced by
+    binding the current figure.
+
+    Raises:
+        ValueError: If the variable name is not a plain Python identifier or the code does not end in an expression.
+    """
+    if not is_variable_name(variable_name):
+        raise ValueError(f"`{variable_name}` is not a valid Python variable name.")
+
+    tree = ast.parse(code)
+    final = tree.body[-1] if tree.body else None
+    if not isinstance(final, ast.Expr):
+        raise ValueError("The procedure does not end in an expression, so there is no result to bind.")
+
+    value = final.value
+    if ast.unparse(value) == "plt.show()":
+        value = ast.parse("plt.gcf()", mode="eval").body
+    tree.body[-1] = ast.Assign(targets=[ast.Name(id=PROCEDURE_RESULT, ctx=ast.Store())], value=value)
+    procedure = ast.unparse(ast.fix_missing_locations(tree))
+
+    return "\n".join(
+        [
+            f"globals().pop({variable_name!r}, None)",
+            "_procedure_scope = dict(globals())",
+            "try:",
+            f"    exec(compile({procedure!r}, '<procedure>', 'exec'), _procedure_scope)",
+            f"    {variable_name} = _procedure_scope[{PROCEDURE_RESULT!r}]",
+            "finally:",
+            "    del _procedure_scope",
+        ]
+    )
+
+
+def evaluation_error(result: dict) -> Optional[str]:
+    """
+    Extract the error raised by code run with `beaker_kernel.evaluate`, if any.
+    """
+    error = result.get("error") if isinstance(result, dict) else None
+    if not error:
+        return None
+    if not isinstance(error, dict):
+        return str(error)
+
+    message = f"{error.get('ename', 'Error')}: {error.get('evalue', '')}"
+    traceback = [re.sub(r"\x1b\[[0-9;]*m", "", line) for line in error.get("traceback") or []]
+    if traceback:
+        message += "\n" + "\n".join(traceback[-3:])
+    return message
+
+
+async def execute_procedure(agent: AgentRef, code: str, result_variable_name: str) -> str:
+    """
+    Run procedure code in the notebook, bind its result to `result_variable_name` and summarize the result.
+
+    The preview image is sent to the notebook as display data and left out of the returned summary.
+    If the code fails, the error is returned instead of a summary.
+    """
+    try:
+        bound_code = bind_result(code, result_variable_name)
+    except ValueError as e:
+        return f"The code was not run. {e} Provide a result_variable_name that is a valid Python variable name."
+
+    start = time.perf_counter()
+    try:
+        result = await agent.context.beaker_kernel.evaluate(
+            bound_code,
+            parent_header={},
+        )
+    except Exception as e:
+        return f"Running the code failed: {e}"
+    elapsed = time.perf_counter() - start
+
+    error = evaluation_error(result)
+    if error:
+        return f"Running the code failed:\n{error}"
+
+    summary_code = agent.context.get_code(
+        "result_summary",
+        {
+            "result_variable_name": result_variable_name,
+        },
+    )
+    summary_result = await agent.context.beaker_kernel.evaluate(
+        summary_code,
+        parent_header={},
+    )
+
+    summary = summary_result.get("return")
+    if not isinstance(summary, dict):
+        details = evaluation_error(summary_result) or "".join(result.get("stderr_list") or [])
+        return f"Running the code did not bind a result to `{result_variable_name}`. {details}".strip()
+    summary["elapsed_seconds"] = round(elapsed, 3)
+
+    image = summary.pop("image", None)
+    if image is not None:
+        agent.context.beaker_kernel.send_response(
+            "iopub",
+            "display_data",
+            {
+                "data": {"image/png": image, "text/plain": f"Preview of {result_variable_name}"},
+                "metadata": {},
+            },
+        )
+        summary["image_displayed"] = True
+
+    return json.dumps(summary)
+
 
 @toolset()
 class ClimateDataUtilityToolset:
@@ -67,6 +200,9 @@ class ClimateDataUtilityToolset:
         agent: AgentRef,
         loop: LoopControllerRef,
         aggregation: Optional[str] = "interp_or_mean",
+        use_overviews: Optional[bool] = False,
+        execute: Optional[bool] = False,
+        result_variable_name: Optional[str] = None,
     ) -> str:
         """
         This tool should be used to show the user code to regrid a netcdf dataset with detectable geo-resolution.
@@ -89,12 +225,18 @@ class ClimateDataUtilityToolset:
                 'mode'
                 'interp_or_mean'
                 'nearest_or_mode'
+            use_overviews (Optional): Whether to use the dataset's overview cache. Defaults to False.
+                When True, a cached overview at the target resolution is reused, otherwise the full dataset is regridded
+                and the result is stored as a new overview. Use this when the same dataset is regridded to coarse resolutions repeatedly.
+            execute (Optional): Whether to run the regridding directly instead of returning code to the user. Defaults to False.
+                Use this if the user asks you to regrid the dataset for them or is running an automated session.
+            result_variable_name (Optional): The notebook variable to store the regridded dataset in when execute is True.
+                Defaults to the dataset name followed by '_regridded'.
 
         Returns:
-            str: Status of whether or not the dataset has been persisted to the HMI server.
+            str: The code used to regrid the dataset, or a summary of the regridded dataset with its shape and timing if execute is True.
         """
 
-        loop.set_state(loop.STOP_SUCCESS)
         code = agent.context.get_code(
             "flowcast_regridding",
             {
@@ -103,7 +245,23 @@ class ClimateDataUtilityToolset:
                 "aggregation": aggregation,
             },
         )
+        if use_overviews:
+            overview_code = agent.context.get_code(
+                "overview_regridding",
+                {
+                    "dataset": dataset,
+                    "target_resolution": target_resolution,
+                    "aggregation": aggregation,
+                },
+            )
+            code = f"{procedure_definitions(code)}\n\n\n{overview_code}"
+
+        if execute:
+            if result_variable_name is None and is_variable_name(f"{dataset}_regridded"):
+                result_variable_name = f"{dataset}_regridded"
+            return await execute_procedure(agent, code, result_variable_name or "")
 
+        loop.set_state(loop.STOP_SUCCESS)
         result = json.dumps(
             {
                 "action": "code_cell",
@@ -124,6 +282,10 @@ class ClimateDataUtilityToolset:
         lat_col: Optional[str] = "lat",
         lon_col: Optional[str] = "lon",
         time_slice_index: Optional[int] = 1,
+        overview_resolution: Optional[float] = None,
+        overview_aggregation: Optional[str] = "interp_or_mean",
+        execute: Optional[bool] = False,
+        result_variable_name: Optional[str] = None,
     ) -> str:
         """
         This function should be used to get a plot of a netcdf dataset.
@@ -133,6 +295,7 @@ class ClimateDataUtilityToolset:
         If the user asks to plot or preview a dataset, use this tool to return plotting code to them.
 
         You should also ask if the user wants to specify the optional arguments by telling them what each argument does.
+        Use the dataset summaries in your context to pick the variable, coordinate and time names rather than guessing.
 
         Args:
             dataset_variable_name (str): The name of the dataset instantiated in the jupyter notebook.
@@ -141,12 +304,18 @@ class ClimateDataUtilityToolset:
             lat_col (Optional): The name of the latitude column. Defaults to 'lat'.
             lon_col (Optional): The name of the longitude column. Defaults to 'lon'.
             time_slice_index (Optional): The index of the time slice to visualize. Defaults to 1.
+            overview_resolution (Optional): The coarsest resolution in degrees that is acceptable for the preview. Defaults to None.
+                If provided, the coarsest cached overview of the dataset at or finer than this resolution is plotted instead of the full dataset.
+            overview_aggregation (Optional): The aggregation of the cached overview to plot. Defaults to 'interp_or_mean'.
+            execute (Optional): Whether to draw the plot directly instead of returning code to the user. Defaults to False.
+                The plot image is shown in the notebook.
+            result_variable_name (Optional): The notebook variable to store the plot figure in when execute is True.
+                Defaults to the dataset name followed by '_plot'.
 
         Returns:
-            str: The code used to plot the netcdf.
+            str: The code used to plot the netcdf, or a summary of the plot with its timing if execute is True.
         """
 
-        loop.set_state(loop.STOP_SUCCESS)
         plot_code = agent.context.get_code(
             "get_netcdf_plot",
             {
@@ -155,9 +324,17 @@ class ClimateDataUtilityToolset:
                 "lat_col": lat_col,
                 "lon_col": lon_col,
                 "time_slice_index": time_slice_index,
+                "overview_resolution": overview_resolution,
+                "overview_aggregation": overview_aggregation,
             },
         )
 
+        if execute:
+            if result_variable_name is None and is_variable_name(f"{dataset_variable_name}_plot"):
+                result_variable_name = f"{dataset_variable_name}_plot"
+            return await execute_procedure(agent, plot_code, result_variable_name or "")
+
+        loop.set_state(loop.STOP_SUCCESS)
         result = json.dumps(
             {
                 "action": "code_cell",
@@ -168,6 +345,64 @@ class ClimateDataUtilityToolset:
 
         return result
 
+    @tool()
+    async def build_overview_pyramid(
+        self,
+        dataset: str,
+        agent: AgentRef,
+        loop: LoopControllerRef,
+        resolutions: Optional[list] = None,
+        aggregation: Optional[str] = "interp_or_mean",
+    ) -> str:
+        """
+        This tool should be used to show the user code that builds an overview pyramid for a netcdf dataset.
+
+        An overview pyramid is a set of coarser regridded copies of the dataset that are stored on disk once and reused,
+        like GeoTIFF overviews. Use this tool if the user will preview or regrid the same large dataset at several coarse resolutions.
+        After the pyramid is built, the regrid_dataset tool with use_overviews and the get_netcdf_plot tool with overview_resolution will use it.
+
+        Args:
+            dataset (str): The name of the dataset instantiated in the jupyter notebook.
+            resolutions (Optional): The overview resolutions in degrees. Defaults to [0.5, 1, 2].
+            aggregation (Optional): The aggregation function used to build the overviews. The options are the same as for the regrid_dataset tool.
+                Defaults to 'interp_or_mean'.
+
+        Returns:
+            str: The code used to build the overview pyramid.
+        """
+
+        if resolutions is None:
+            resolutions = [0.5, 1, 2]
+
+        loop.set_state(loop.STOP_SUCCESS)
+        regrid_code = agent.context.get_code(
+            "flowcast_regridding",
+            {
+                "dataset": dataset,
+                "target_resolution": None,
+                "aggregation": aggregation,
+            },
+        )
+        pyramid_code = agent.context.get_code(
+            "overview_pyramid",
+            {
+                "dataset": dataset,
+                "resolutions": resolutions,
+                "aggregation": aggregation,
+            },
+        )
+        code = f"{procedure_definitions(regrid_code)}\n\n\n{pyramid_code}"
+
+        result = json.dumps(
+            {
+                "action": "code_cell",
+                "language": "python3",
+                "content": code.strip(),
+            }
+        )
+
+        return result
+
 
 class ClimateDataUtilityAgent(BaseAgent):
     """
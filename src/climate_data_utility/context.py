@@ -1,4 +1,5 @@
 from typing import TYPE_CHECKING, Any, Dict, Optional
+import asyncio
 import json
 import codecs
 
@@ -10,7 +11,7 @@ from beaker_kernel.lib.utils import intercept
 from archytas.tool_utils import LoopControllerRef
 
 
-from .agent import ClimateDataUtilityAgent
+from .agent import ClimateDataUtilityAgent, evaluation_error
 
 import logging
 
@@ -21,6 +22,13 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Limits on how much of the dataset summaries is added to the agent context.
+MAX_SUMMARY_VARIABLES_PER_DATASET = 20
+MAX_SUMMARY_LINES = 150
+# How long an agent query waits for the summaries to refresh, e.g. while a long cell is running, before it falls
+# back to the cached summaries.
+SUMMARY_REFRESH_TIMEOUT_SECONDS = 2
+
 
 class ClimateDataUtilityContext(BaseContext):
     slug = "climate_data_utility"
@@ -35,6 +43,7 @@ class ClimateDataUtilityContext(BaseContext):
         if not isinstance(subkernel, PythonSubkernel):
             raise ValueError("This context is only valid for Python.")
         self.climate_data_utility__functions = {}
+        self.dataset_summaries = {}
         self.config = config
         super().__init__(beaker_kernel, subkernel, self.agent_cls, config)
 
@@ -48,10 +57,111 @@ class ClimateDataUtilityContext(BaseContext):
     Please provide assistance to users with their queries related to climate dataset operations.
 
     Remember to provide accurate information and avoid guessing if you are unsure of an answer.
+    """
+
+        await self.update_dataset_summaries()
+        if self.dataset_summaries:
+            intro += f"""
+    The following xarray datasets are currently loaded in the notebook.
+    Use these variable, dimension and coordinate names when calling tools instead of guessing them.
+
+{self.format_dataset_summaries()}
     """
 
         return intro
 
+    async def update_dataset_summaries(self):
+        """
+        Refresh the cached metadata summaries of the xarray datasets in the notebook.
+        Only datasets that are new or whose structure changed are summarized again, and only headers
+        and coordinates are read so no data is loaded. If the notebook is busy for longer than
+        SUMMARY_REFRESH_TIMEOUT_SECONDS, the cached summaries are kept as they are.
+        """
+        known_fingerprints = {name: cached["fingerprint"] for name, cached in self.dataset_summaries.items()}
+        code = self.get_code(
+            "dataset_metadata_summary",
+            {
+                "known_fingerprints": known_fingerprints,
+            },
+        )
+        try:
+            result = await asyncio.wait_for(
+                self.beaker_kernel.evaluate(
+                    code,
+                    parent_header={},
+                ),
+                timeout=SUMMARY_REFRESH_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            logger.info("The notebook is busy, using the cached dataset summaries.")
+            return
+        except Exception as e:
+            logger.error(f"Unable to summarize notebook datasets: {e}")
+            return
+
+        summary_result = result.get("return")
+        if not isinstance(summary_result, dict):
+            logger.error(f"Unable to summarize notebook datasets: {evaluation_error(result) or summary_result}")
+            return
+
+        current_names = set(summary_result.get("names", []))
+        for name in list(self.dataset_summaries):
+            if name not in current_names:
+                del self.dataset_summaries[name]
+        self.dataset_summaries.update(summary_result.get("changed", {}))
+
+    def format_dataset_summaries(self):
+        """
+        Render the cached dataset summaries as compact text for the agent context.
+        Each dataset lists at most MAX_SUMMARY_VARIABLES_PER_DATASET variables and the whole text at most
+        MAX_SUMMARY_LINES lines, with a line noting how much was left out.
+        """
+        lines = []
+        datasets = sorted(self.dataset_summaries.items())
+        for dataset_index, (name, cached) in enumerate(datasets):
+            if len(lines) >= MAX_SUMMARY_LINES:
+                lines.append(f"    ... {len(datasets) - dataset_index} more datasets")
+                break
+
+            if "error" in cached:
+                lines.append(f"    - `{name}` (could not be summarized: {cached['error']})")
+                continue
+
+            summary = cached["summary"]
+            dims = ", ".join(f"{dim}={size}" for dim, size in summary["dims"].items())
+            size_mb = summary["estimated_size_bytes"] / 1e6
+            lines.append(f"    - `{name}` ({summary['type']}, dims: {dims}, estimated size: {size_mb:.1f} MB)")
+
+            dataset_lines = []
+            for coord_name, coord in summary["coords"].items():
+                details = f"dims={tuple(coord['dims'])}, size={coord['size']}, dtype={coord['dtype']}"
+                if coord.get("min") is not None:
+                    details += f", extent=[{coord['min']}, {coord['max']}]"
+                elif "first" in coord:
+                    details += f", extent=[{coord['first']}, {coord['last']}]"
+                if coord.get("spacing") is not None:
+                    details += f", spacing={coord['spacing']} ({'regular' if coord['regular'] else 'irregular'})"
+                dataset_lines.append(f"        coordinate `{coord_name}`: {details}")
+
+            variables = list(summary["variables"].items())
+            for var_name, var in variables[:MAX_SUMMARY_VARIABLES_PER_DATASET]:
+                details = f"dims={tuple(var['dims'])}, shape={tuple(var['shape'])}, dtype={var['dtype']}"
+                if var.get("units"):
+                    details += f", units={var['units']}"
+                if var.get("long_name"):
+                    details += f", long_name={var['long_name']}"
+                dataset_lines.append(f"        variable `{var_name}`: {details}")
+            if len(variables) > MAX_SUMMARY_VARIABLES_PER_DATASET:
+                dataset_lines.append(f"        ... {len(variables) - MAX_SUMMARY_VARIABLES_PER_DATASET} more variables")
+
+            remaining = MAX_SUMMARY_LINES - len(lines)
+            if len(dataset_lines) > remaining:
+                omitted = len(dataset_lines) - remaining
+                dataset_lines = dataset_lines[:remaining] + [f"        ... {omitted} more lines for `{name}`"]
+            lines.extend(dataset_lines)
+
+        return "\n".join(lines)
+
     @intercept()
     async def download_dataset_request(self, message):
         """
@@ -72,12 +182,21 @@ class ClimateDataUtilityContext(BaseContext):
             },
         )
 
-        code_download = await self.beaker_kernel.evaluate(
-            code,
-            parent_header={},
-        )
+        try:
+            code_download = await self.beaker_kernel.evaluate(
+                code,
+                parent_header={},
+            )
+            error = evaluation_error(code_download)
+        except Exception as e:
+            error = str(e)
 
-        download_bytes = code_download.get("return")
+        self.beaker_kernel.send_response(
+            "iopub",
+            "download_dataset_response",
+            {"uuid": uuid, "filename": filename, "status": "error" if error else "ok", "error": error},
+            parent_header=message.header,
+        )
 
     @intercept()
     async def save_dataset_request(self, message):
@@ -90,42 +209,58 @@ class ClimateDataUtilityContext(BaseContext):
         dataset = content.get("dataset")
         new_dataset_filename = content.get("filename")
 
-        create_code = self.get_code(
-            "hmi_create_dataset",
-            {
-                "identifier": new_dataset_filename,
-            },
-        )
-        create_response = await self.beaker_kernel.evaluate(
-            create_code,
-            parent_header={},
-        )
-
-        create_response_object = create_response.get("return")
+        create_response_object = None
+        persist_status = None
+        try:
+            create_code = self.get_code(
+                "hmi_create_dataset",
+                {
+                    "identifier": new_dataset_filename,
+                },
+            )
+            create_response = await self.beaker_kernel.evaluate(
+                create_code,
+                parent_header={},
+            )
+            error = evaluation_error(create_response)
+            if not error:
+                create_response_object = create_response.get("return")
+                if isinstance(create_response_object, str):
+                    error = create_response_object
+                elif not isinstance(create_response_object, dict) or not create_response_object.get("id"):
+                    error = f"Dataset creation did not return a dataset id: {create_response_object}"
 
-        if isinstance(create_response_object, str):
-            return create_response_object
-
-        id = create_response_object.get("id")
-
-        persist_code = self.get_code(
-            "hmi_dataset_put",
-            {
-                "data": dataset,
-                "id": id,
-                "filename": f"{new_dataset_filename}",
-            },
-        )
-
-        result = await self.beaker_kernel.evaluate(
-            persist_code,
-            parent_header={},
-        )
-
-        persist_status = result.get("return")
+            if not error:
+                persist_code = self.get_code(
+                    "hmi_dataset_put",
+                    {
+                        "data": dataset,
+                        "id": create_response_object["id"],
+                        "filename": f"{new_dataset_filename}",
+                    },
+                )
+                result = await self.beaker_kernel.evaluate(
+                    persist_code,
+                    parent_header={},
+                )
+                error = evaluation_error(result)
+                if not error:
+                    persist_status = result.get("return")
+                    if persist_status is None:
+                        error = "File upload did not return a status."
+                    elif isinstance(persist_status, str) and "failed" in persist_status:
+                        error = persist_status
+        except Exception as e:
+            error = str(e)
 
         self.beaker_kernel.send_response(
             "iopub",
             "save_dataset_response",
-            {"dataset_create_status": create_response_object, "file_upload_status": persist_status},
+            {
+                "dataset_create_status": create_response_object,
+                "file_upload_status": persist_status,
+                "status": "error" if error else "ok",
+                "error": error,
+            },
+            parent_header=message.header,
         )
@@ -0,0 +1,192 @@
+"""
+Overview pyramid cache for climate datasets.
+
+Overviews are regridded copies of a dataset at coarser resolutions, stored on disk per dataset fingerprint and
+aggregation, like GeoTIFF overviews. This module is used by the regridding and plotting procedures that run in the
+notebook subkernel.
+"""
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+import xarray as xr
+
+# Fingerprints of recently seen datasets, keyed by the ids of the dataset, its variables and their data arrays.
+MAX_CACHED_FINGERPRINTS = 32
+_fingerprint_cache = {}
+
+
+def overview_cache_dir() -> Path:
+    """
+    The directory overviews are stored in, set by the OVERVIEW_CACHE_DIR environment variable.
+    """
+    return Path(os.getenv("OVERVIEW_CACHE_DIR") or Path.home() / ".cache" / "beaker_climate_data_utility" / "overviews")
+
+
+def _update_digest(digest, name, values: np.ndarray):
+    digest.update(f"{name}:{values.dtype}:{values.shape}".encode())
+    if values.dtype == object:
+        digest.update(repr(values.tolist()).encode())
+    else:
+        digest.update(np.ascontiguousarray(values).tobytes())
+
+
+def _lazy_file_source(variable: xr.Variable):
+    """
+    The file a variable is read from, or None if its data has been loaded, chunked or reshaped.
+    Only a variable that still wraps the lazy backend array is guaranteed to match the file, since the
+    encoding is kept when data is edited after `.load()` or rearranged, e.g. by `roll(roll_coords=False)`.
+    """
+    if variable._in_memory or variable.chunks is not None:
+        return None
+    source = variable.encoding.get("source")
+    if not isinstance(source, str) or not os.path.isfile(source):
+        return None
+    if tuple(variable.encoding.get("original_shape", ())) != variable.shape:
+        return None
+    return source
+
+
+def _compute_fingerprint(dataset: xr.Dataset) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for coord_name in sorted(dataset.coords, key=str):
+        _update_digest(digest, coord_name, dataset[coord_name].values)
+
+    for var_name in sorted(dataset.data_vars, key=str):
+        variable = dataset[var_name].variable
+        digest.update(f"{var_name}:{variable.dims}:{sorted(variable.attrs.items())}".encode())
+        source = _lazy_file_source(variable)
+        if source is not None:
+            stat = os.stat(source)
+            digest.update(f"{os.path.abspath(source)}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+        elif variable.chunks is not None:
+            # Dask names are tokens of the whole task graph, so they identify the data without computing it.
+            digest.update(f"dask:{variable.data.name}".encode())
+        else:
+            _update_digest(digest, var_name, variable.values)
+
+    digest.update(repr(sorted(dataset.attrs.items())).encode())
+    return digest.hexdigest()
+
+
+def dataset_fingerprint(dataset: xr.Dataset) -> str:
+    """
+    Fingerprint a dataset without reading file-backed or dask-backed data.
+
+    Coordinates are always hashed. Data variables that still wrap the lazy array of the file they were opened
+    from are keyed on the file path, modification time and size, dask-backed variables on their dask name, and
+    all other data variables on a hash of their values. Fingerprints are cached per dataset object and its
+    variables, so values modified in place after they were fingerprinted are not noticed.
+
+    Args:
+        dataset (xarray.Dataset): The dataset to fingerprint.
+
+    Returns:
+        str: A hex digest identifying the dataset.
+    """
+    # Loading a variable swaps its data array, so loaded data is fingerprinted again by value.
+    key = (
+        id(dataset),
+        tuple((str(name), id(variable), id(variable._data)) for name, variable in dataset.variables.items()),
+    )
+    if key not in _fingerprint_cache:
+        if len(_fingerprint_cache) >= MAX_CACHED_FINGERPRINTS:
+            del _fingerprint_cache[next(iter(_fingerprint_cache))]
+        _fingerprint_cache[key] = _compute_fingerprint(dataset)
+    return _fingerprint_cache[key]
+
+
+def overview_levels(fingerprint: str, aggregation: str) -> dict:
+    """
+    List the cached overview levels of a dataset for an aggregation.
+
+    Args:
+        fingerprint (str): The fingerprint of the dataset.
+        aggregation (str): The aggregation the overviews were built with.
+
+    Returns:
+        dict: Mapping of (lon_resolution, lat_resolution) to the path of the cached overview.
+    """
+    levels = {}
+    for path in (overview_cache_dir() / fingerprint / aggregation).glob("*.nc"):
+        lon_resolution, lat_resolution = path.stem.split("_")
+        levels[(float(lon_resolution), float(lat_resolution))] = path
+    return levels
+
+
+def open_overview(dataset: xr.Dataset, resolution: float, aggregation: str) -> xr.Dataset:
+    """
+    Open the coarsest cached overview of the dataset that is still at least as detailed as `resolution`.
+
+    Returns:
+        xarray.Dataset: The overview, or the dataset itself if no suitable overview is cached.
+    """
+    levels = {
+        max(level): path
+        for level, path in overview_levels(dataset_fingerprint(dataset), aggregation).items()
+        if max(level) <= resolution
+    }
+    if not levels:
+        print(f"No overview at or finer than {resolution} degrees is cached, using the full dataset.")
+        return dataset
+    return xr.open_dataset(levels[max(levels)])
+
+
+def regrid_with_overviews(dataset: xr.Dataset, target_resolution: tuple, aggregation: str, regrid, fingerprint=None):
+    """
+    Regrid a dataset to the target resolution, reusing and populating its overview cache.
+
+    A cached overview at the target resolution is returned directly. Otherwise the full dataset is regridded and
+    the result is stored as a new overview level. Coarser levels are never computed from finer ones, since the
+    target grids of different resolutions do not nest.
+
+    Args:
+        dataset (xarray.Dataset): The dataset to regrid.
+        target_resolution (tuple): The target resolution to regrid to, e.g. (0.5, 0.5).
+        aggregation (str): The aggregation used by `regrid`.
+        regrid (callable): Function regridding a dataset to a target resolution.
+        fingerprint (Optional): The fingerprint of the dataset, if it has already been computed.
+
+    Returns:
+        xarray.Dataset: The regridded dataset.
+    """
+    target_resolution = tuple(float(resolution) for resolution in target_resolution)
+    if fingerprint is None:
+        fingerprint = dataset_fingerprint(dataset)
+    levels = overview_levels(fingerprint, aggregation)
+
+    if target_resolution in levels:
+        return xr.open_dataset(levels[target_resolution])
+
+    regridded_dataset = regrid(dataset, target_resolution)
+
+    # Write to a temporary file first so that concurrent readers never see a partial overview.
+    level_dir = overview_cache_dir() / fingerprint / aggregation
+    level_dir.mkdir(parents=True, exist_ok=True)
+    level_path = level_dir / f"{target_resolution[0]}_{target_resolution[1]}.nc"
+    temporary_path = level_path.with_suffix(f".{os.getpid()}.tmp")
+    regridded_dataset.to_netcdf(temporary_path)
+    os.replace(temporary_path, level_path)
+
+    return regridded_dataset
+
+
+def build_overview_pyramid(dataset: xr.Dataset, resolutions: list, aggregation: str, regrid) -> dict:
+    """
+    Build the missing overview levels of a dataset, each regridded from the full dataset.
+
+    Args:
+        dataset (xarray.Dataset): The dataset to build overviews for.
+        resolutions (list): The overview resolutions in degrees, e.g. [0.5, 1, 2].
+        aggregation (str): The aggregation used by `regrid`.
+        regrid (callable): Function regridding a dataset to a target resolution.
+
+    Returns:
+        dict: Mapping of each overview resolution to its cached file.
+    """
+    fingerprint = dataset_fingerprint(dataset)
+    for resolution in sorted(resolutions):
+        regrid_with_overviews(dataset, (resolution, resolution), aggregation, regrid, fingerprint=fingerprint)
+    levels = overview_levels(fingerprint, aggregation)
+    return {level: str(path) for level, path in sorted(levels.items())}
@@ -0,0 +1,148 @@
+import numpy as np
+import xarray as xr
+
+def _dataset_fingerprint(name, data):
+    """
+    Build a cheap fingerprint for an xarray object from its identity, structure and indexes.
+    Assigning a variable or coordinate replaces its `Variable` object, so the variable ids change with it.
+    This never touches the underlying data arrays.
+    """
+    variables = dict(data.variables) if isinstance(data, xr.Dataset) else dict(data.coords.variables)
+    if isinstance(data, xr.DataArray):
+        variables[str(data.name)] = data.variable
+    structure = sorted((str(var_name), tuple(var.dims), str(var.dtype), id(var)) for var_name, var in variables.items())
+    indexes = sorted(
+        (str(index_name), len(index), str(index[0]) if len(index) else None, str(index[-1]) if len(index) else None)
+        for index_name, index in data.indexes.items()
+    )
+    return f"{name}:{id(data)}:{sorted(data.sizes.items())}:{structure}:{indexes}"
+
+
+def _coordinate_value(value):
+    """
+    Convert a coordinate value to a plain Python value.
+    Non-finite numbers become None since the result is returned as a Python literal, where `nan` is not valid.
+    """
+    if isinstance(value, (np.datetime64, np.timedelta64)):
+        return str(value)
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    return str(value)
+
+
+def _summarize_coordinate(coord, index=None):
+    """
+    Summarize the extent and spacing of a coordinate.
+    Index coordinates are already held in memory by xarray; other coordinates are read on their own.
+    """
+    values = np.asarray(index if index is not None else coord.values)
+    summary = {
+        "dims": list(coord.dims),
+        "size": int(values.size),
+        "dtype": str(coord.dtype),
+    }
+    if values.size == 0:
+        return summary
+    if not (np.issubdtype(values.dtype, np.number) or np.issubdtype(values.dtype, np.datetime64)):
+        # Non-numeric coordinates, e.g. cftime dates, only report their first and last values.
+        summary["first"] = str(values.flat[0])
+        summary["last"] = str(values.flat[-1])
+        return summary
+
+    if np.issubdtype(values.dtype, np.floating):
+        # Ignore fill values such as NaN in curvilinear coordinates.
+        finite_values = values[np.isfinite(values)]
+        if finite_values.size == 0:
+            return summary
+        summary["min"] = _coordinate_value(finite_values.min())
+        summary["max"] = _coordinate_value(finite_values.max())
+    else:
+        summary["min"] = _coordinate_value(values.min())
+        summary["max"] = _coordinate_value(values.max())
+
+    if values.ndim == 1 and values.size > 1:
+        diffs = np.diff(values)
+        if np.issubdtype(values.dtype, np.datetime64):
+            spacing = np.sort(diffs)[diffs.size // 2]
+            summary["spacing"] = str(spacing)
+            summary["regular"] = bool((diffs == spacing).all())
+        else:
+            spacing = np.median(diffs)
+            summary["spacing"] = _coordinate_value(spacing)
+            summary["regular"] = bool(np.allclose(diffs, spacing, rtol=1e-3))
+
+    return summary
+
+
+def _summarize_dataset(data):
+    """
+    Summarize the dimensions, variables and coordinates of an xarray object without loading its data.
+    """
+    if isinstance(data, xr.DataArray):
+        data_vars = {data.name or "<unnamed>": data.variable}
+    else:
+        data_vars = {var_name: var.variable for var_name, var in data.data_vars.items()}
+
+    variables = {}
+    estimated_size = 0
+    for var_name, var in data_vars.items():
+        var_size = int(np.prod(var.shape, dtype=np.int64)) * var.dtype.itemsize
+        estimated_size += var_size
+        variables[str(var_name)] = {
+            "dims": list(var.dims),
+            "shape": [int(size) for size in var.shape],
+            "dtype": str(var.dtype),
+            "units": str(var.attrs["units"]) if "units" in var.attrs else None,
+            "long_name": str(var.attrs["long_name"]) if "long_name" in var.attrs else None,
+        }
+
+    coords = {}
+    for coord_name, coord in data.coords.items():
+        index = data.indexes[coord_name] if coord_name in data.indexes else None
+        coords[str(coord_name)] = _summarize_coordinate(coord, index)
+
+    return {
+        "type": type(data).__name__,
+        "dims": {str(dim): int(size) for dim, size in data.sizes.items()},
+        "variables": variables,
+        "coords": coords,
+        "estimated_size_bytes": estimated_size,
+    }
+
+
+def _summarize_notebook_datasets(known_fingerprints):
+    """
+    Summarize the xarray datasets in the notebook that are new or changed since they were last summarized.
+    The work is done inside this function so that no references to the datasets are left in the notebook.
+    """
+    current_datasets = {
+        name: value
+        for name, value in globals().items()
+        if not name.startswith("_") and isinstance(value, (xr.Dataset, xr.DataArray))
+    }
+
+    changed_summaries = {}
+    for dataset_name, dataset_value in current_datasets.items():
+        fingerprint = _dataset_fingerprint(dataset_name, dataset_value)
+        if known_fingerprints.get(dataset_name) == fingerprint:
+            continue
+        # A dataset that cannot be summarized must not stop the others from being summarized.
+        try:
+            changed_summaries[dataset_name] = {
+                "fingerprint": fingerprint,
+                "summary": _summarize_dataset(dataset_value),
+            }
+        except Exception as e:
+            changed_summaries[dataset_name] = {
+                "fingerprint": fingerprint,
+                "error": f"{type(e).__name__}: {e}",
+            }
+
+    return {"names": list(current_datasets), "changed": changed_summaries}
+
+
+_summarize_notebook_datasets({{known_fingerprints}})
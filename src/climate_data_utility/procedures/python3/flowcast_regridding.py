@@ -1,6 +1,6 @@
 import numpy as np
 import xarray as xr
-from flowcast.regrid import regrid_1d
+from flowcast.regrid import regrid_1d, RegridType
 import io
 
 
@@ -59,8 +59,8 @@ def regrid_dataset(dataset, target_resolution: tuple):
     data_vars = [var for var in dataset.variables if var not in dataset.dims]
 
     # Regrid the dataset
-    new_data = regrid_1d(dataset.to_array(), lats, 'lat', aggregation={{aggregation}})
-    new_data = regrid_1d(new_data, lons, 'lon', aggregation={{aggregation}})
+    new_data = regrid_1d(dataset.to_array(), lats, 'lat', aggregation=RegridType["{{aggregation}}"])
+    new_data = regrid_1d(new_data, lons, 'lon', aggregation=RegridType["{{aggregation}}"])
 
     regridded_dataset = new_data.to_dataset(dim='variable')
 
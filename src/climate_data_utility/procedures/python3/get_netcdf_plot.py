@@ -7,8 +7,17 @@ plot_variable_name = {{plot_variable_name}}
 lat_col = "{{lat_col}}"
 lon_col = "{{lon_col}}"
 time_slice_index = {{time_slice_index}}
+overview_resolution = {{overview_resolution}}
+overview_aggregation = "{{overview_aggregation}}"
 
 ds = {{dataset}}
+
+if overview_resolution is not None:
+    from climate_data_utility.overviews import open_overview
+
+    # Preview the coarsest cached overview that is still at least as detailed as the requested resolution.
+    ds = open_overview(ds, overview_resolution, overview_aggregation)
+
 if plot_variable_name is None:
     plot_variable_name = list(ds.data_vars)[0]
 
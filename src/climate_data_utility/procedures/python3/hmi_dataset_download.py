@@ -37,7 +37,7 @@ else:
     message = f'Dataset retrieval failed with status code {response.status_code}.'
     if response.text:
         message += f' Response message: {response.text}'
-    message
+    raise RuntimeError(message)
 
 
 dataset = xarray.open_dataset(response.content)
@@ -0,0 +1,3 @@
+from climate_data_utility.overviews import build_overview_pyramid
+
+build_overview_pyramid(load_dataset({{dataset}}), {{resolutions}}, "{{aggregation}}", regrid_dataset)
@@ -0,0 +1,3 @@
+from climate_data_utility.overviews import regrid_with_overviews
+
+regrid_with_overviews(load_dataset({{dataset}}), {{target_resolution}}, "{{aggregation}}", regrid_dataset)
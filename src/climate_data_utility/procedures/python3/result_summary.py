@@ -0,0 +1,49 @@
+import base64
+import io
+
+import matplotlib.pyplot as plt
+import xarray as xr
+from matplotlib.figure import Figure
+
+
+def _summarize_result(result_variable_name, result_value):
+    """
+    Summarize a result bound in the notebook, with a base64 encoded PNG preview when one can be drawn.
+    The work is done inside this function so that no temporaries are left in the notebook.
+    """
+    summary = {
+        "variable": result_variable_name,
+        "type": type(result_value).__name__,
+    }
+    figure = None
+
+    if isinstance(result_value, (xr.Dataset, xr.DataArray)):
+        summary["dims"] = {str(dim): int(size) for dim, size in result_value.sizes.items()}
+        summary["estimated_size_bytes"] = int(result_value.nbytes)
+
+        if isinstance(result_value, xr.Dataset):
+            summary["variables"] = {str(name): list(var.shape) for name, var in result_value.data_vars.items()}
+            preview_variable = result_value[list(result_value.data_vars)[0]] if result_value.data_vars else None
+        else:
+            summary["shape"] = list(result_value.shape)
+            preview_variable = result_value
+
+        # Quick look at the first slice of the first variable.
+        if preview_variable is not None and preview_variable.ndim > 0:
+            preview = preview_variable.isel({dim: 0 for dim in preview_variable.dims[:-2]})
+            figure, axis = plt.subplots(figsize=(8, 4))
+            preview.plot(ax=axis)
+
+    elif isinstance(result_value, Figure):
+        figure = result_value
+
+    if figure is not None:
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format="png", bbox_inches="tight")
+        plt.close(figure)
+        summary["image"] = base64.b64encode(buffer.getvalue()).decode("ascii")
+
+    return summary
+
+
+_summarize_result("{{result_variable_name}}", {{result_variable_name}})
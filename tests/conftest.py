@@ -0,0 +1,22 @@
+import re
+from pathlib import Path
+
+PROCEDURES_DIR = Path(__file__).resolve().parent.parent / "src" / "climate_data_utility" / "procedures" / "python3"
+
+
+def render_procedure(name: str, **params) -> str:
+    """
+    Render a procedure template the way `BaseContext.get_code` does for the plain `{{ name }}` substitutions
+    used by this package's procedures.
+    """
+    template = (PROCEDURES_DIR / f"{name}.py").read_text()
+    return re.sub(r"{{\s*(\w+)\s*}}", lambda match: str(params[match[1]]), template)
+
+
+def run_procedure(code: str, namespace: dict):
+    """
+    Run procedure code in `namespace` like a notebook cell and return the value of its final expression.
+    """
+    *body, final = code.rstrip().split("\n")
+    exec("\n".join(body), namespace)
+    return eval(final, namespace)
@@ -0,0 +1,74 @@
+import pytest
+
+pytest.importorskip("archytas")
+pytest.importorskip("beaker_kernel")
+
+from climate_data_utility.agent import bind_result, evaluation_error, procedure_definitions  # noqa: E402
+
+
+def run_bound(code, variable_name, namespace):
+    exec(bind_result(code, variable_name), namespace)
+    return {name: value for name, value in namespace.items() if name != "__builtins__"}
+
+
+def test_result_is_bound_without_leaking_procedure_names():
+    code = "scale = 2\ndef helper(value):\n    return value * scale\nhelper(data)"
+
+    namespace = run_bound(code, "result", {"data": 21, "result": "stale"})
+
+    assert namespace == {"data": 21, "result": 42}
+
+
+def test_stale_result_is_removed_when_the_procedure_fails():
+    namespace = {"result": "stale"}
+
+    with pytest.raises(ZeroDivisionError):
+        exec(bind_result("1 / 0", "result"), namespace)
+
+    assert "result" not in namespace
+    assert "_procedure_scope" not in namespace
+
+
+def test_trailing_show_binds_the_current_figure():
+    bound = bind_result("import matplotlib.pyplot as plt\nplt.plot([1, 2])\nplt.show()", "figure")
+
+    assert "plt.gcf()" in bound
+    assert "plt.show()" not in bound
+
+
+@pytest.mark.parametrize("variable_name", ["", "1st", "class", "a.b", "x; import os"])
+def test_invalid_variable_names_are_rejected(variable_name):
+    with pytest.raises(ValueError, match="not a valid Python variable name"):
+        bind_result("1 + 1", variable_name)
+
+
+def test_code_without_final_expression_is_rejected():
+    with pytest.raises(ValueError, match="does not end in an expression"):
+        bind_result("value = 1", "result")
+
+
+def test_procedure_definitions_drop_the_final_call():
+    code = "import math\n\n\ndef area(radius):\n    return math.pi * radius**2\n\n\narea(\n    2,\n)\n"
+
+    definitions = procedure_definitions(code)
+
+    assert definitions.endswith("return math.pi * radius**2")
+    namespace = {}
+    exec(definitions, namespace)
+    assert namespace["area"](1) == pytest.approx(3.14159, rel=1e-5)
+
+
+@pytest.mark.parametrize(
+    "result, expected",
+    [
+        ({"return": 1}, None),
+        (None, None),
+        ({"error": "Kernel died"}, "Kernel died"),
+        (
+            {"error": {"ename": "KeyError", "evalue": "'tas'", "traceback": ["a", "b", "\x1b[0;31mc\x1b[0m", "d"]}},
+            "KeyError: 'tas'\nb\nc\nd",
+        ),
+    ],
+)
+def test_evaluation_error(result, expected):
+    assert evaluation_error(result) == expected
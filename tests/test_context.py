@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("beaker_kernel")
+
+from climate_data_utility import context as context_module  # noqa: E402
+from climate_data_utility.context import ClimateDataUtilityContext  # noqa: E402
+
+
+def summary(variable_count, coord_extent=(-1.0, 1.0)):
+    return {
+        "fingerprint": "fingerprint",
+        "summary": {
+            "type": "Dataset",
+            "dims": {"lat": 3},
+            "estimated_size_bytes": 1_000_000,
+            "coords": {
+                "lat": {
+                    "dims": ["lat"],
+                    "size": 3,
+                    "dtype": "float64",
+                    "min": coord_extent[0],
+                    "max": coord_extent[1],
+                    "spacing": None,
+                }
+            },
+            "variables": {
+                f"var{index}": {"dims": ["lat"], "shape": [3], "dtype": "float32"} for index in range(variable_count)
+            },
+        },
+    }
+
+
+class FakeContext:
+    format_dataset_summaries = ClimateDataUtilityContext.format_dataset_summaries
+    update_dataset_summaries = ClimateDataUtilityContext.update_dataset_summaries
+
+    def __init__(self, summaries=None, beaker_kernel=None):
+        self.dataset_summaries = summaries or {}
+        self.beaker_kernel = beaker_kernel
+
+    def get_code(self, name, render_dict):
+        return name
+
+
+def test_variables_per_dataset_are_capped():
+    text = FakeContext({"ds": summary(30)}).format_dataset_summaries()
+
+    assert "`var19`" in text
+    assert "`var20`" not in text
+    assert "... 10 more variables" in text
+
+
+def test_total_lines_are_capped():
+    summaries = {f"ds{index}": summary(20) for index in range(20)}
+    lines = FakeContext(summaries).format_dataset_summaries().splitlines()
+
+    assert len(lines) <= context_module.MAX_SUMMARY_LINES + 2
+    assert lines[-1].strip().startswith("...")
+    assert "more datasets" in lines[-1]
+
+
+def test_missing_extents_and_errors_are_rendered():
+    summaries = {
+        "broken": {"fingerprint": "fingerprint", "error": "ValueError: broken"},
+        "ds": summary(1, coord_extent=(None, None)),
+    }
+    text = FakeContext(summaries).format_dataset_summaries()
+
+    assert "`broken` (could not be summarized: ValueError: broken)" in text
+    assert "extent" not in text
+    assert "spacing" not in text
+
+
+def test_busy_notebook_keeps_cached_summaries(monkeypatch):
+    class BusyKernel:
+        async def evaluate(self, code, parent_header):
+            await asyncio.sleep(10)
+
+    monkeypatch.setattr(context_module, "SUMMARY_REFRESH_TIMEOUT_SECONDS", 0.01)
+    cached = {"ds": summary(1)}
+    fake_context = FakeContext(dict(cached), BusyKernel())
+
+    asyncio.run(fake_context.update_dataset_summaries())
+
+    assert fake_context.dataset_summaries == cached
@@ -0,0 +1,88 @@
+import ast
+
+import pytest
+
+from tests.conftest import render_procedure, run_procedure
+
+np = pytest.importorskip("numpy")
+xr = pytest.importorskip("xarray")
+
+
+def summarize(namespace, known_fingerprints=None):
+    code = render_procedure("dataset_metadata_summary", known_fingerprints=known_fingerprints or {})
+    return run_procedure(code, namespace)
+
+
+def make_dataset():
+    return xr.Dataset(
+        {"tas": (("time", "lat", "lon"), np.zeros((2, 3, 4), dtype="float32"), {"units": "K"})},
+        coords={"time": np.arange(2), "lat": [-1.0, 0.0, 1.0], "lon": [0.0, 1.0, 2.0, 3.0]},
+    )
+
+
+def test_summary_reports_dims_extents_and_spacing():
+    result = summarize({"ds": make_dataset()})
+
+    summary = result["changed"]["ds"]["summary"]
+    assert result["names"] == ["ds"]
+    assert summary["dims"] == {"time": 2, "lat": 3, "lon": 4}
+    assert summary["variables"]["tas"]["shape"] == [2, 3, 4]
+    assert summary["estimated_size_bytes"] == 2 * 3 * 4 * 4
+    assert summary["coords"]["lon"]["min"] == 0.0
+    assert summary["coords"]["lon"]["max"] == 3.0
+    assert summary["coords"]["lon"]["spacing"] == 1.0
+    assert summary["coords"]["lon"]["regular"]
+
+
+def test_summary_is_a_python_literal_with_non_finite_coordinates():
+    lat2d = np.full((3, 4), np.nan)
+    lat2d[0, 0] = 5.0
+    dataset = make_dataset().assign_coords(
+        lat2d=(("lat", "lon"), lat2d),
+        fill=("lon", [np.nan, np.inf, np.nan, np.nan]),
+    )
+
+    result = summarize({"ds": dataset})
+
+    # The kernel returns the repr of the result, which must parse back.
+    parsed = ast.literal_eval(repr(result))
+    coords = parsed["changed"]["ds"]["summary"]["coords"]
+    assert coords["lat2d"]["min"] == 5.0
+    assert coords["fill"]["spacing"] is None
+
+
+def test_unchanged_datasets_are_skipped_and_coordinate_edits_are_detected():
+    namespace = {"ds": make_dataset()}
+    first = summarize(namespace)
+    known = {name: cached["fingerprint"] for name, cached in first["changed"].items()}
+
+    assert summarize(namespace, known)["changed"] == {}
+
+    namespace["ds"]["lon"] = (namespace["ds"].lon + 180) % 360 - 180
+    assert "ds" in summarize(namespace, known)["changed"]
+
+
+def test_failing_dataset_does_not_stop_the_others(monkeypatch):
+    namespace = {"good": make_dataset(), "bad": make_dataset()}
+    code = render_procedure("dataset_metadata_summary", known_fingerprints={})
+    *body, final = code.rstrip().split("\n")
+    exec("\n".join(body), namespace)
+    summarize_dataset = namespace["_summarize_dataset"]
+
+    def failing_summarize(data):
+        if data is namespace["bad"]:
+            raise ValueError("broken")
+        return summarize_dataset(data)
+
+    namespace["_summarize_dataset"] = failing_summarize
+    result = eval(final, namespace)
+
+    assert "summary" in result["changed"]["good"]
+    assert result["changed"]["bad"]["error"] == "ValueError: broken"
+
+
+def test_no_datasets_are_left_in_the_namespace():
+    namespace = {"ds": make_dataset()}
+    summarize(namespace)
+
+    assert {name for name in namespace if not name.startswith("_")} == {"ds", "np", "xr"}
@@ -0,0 +1,33 @@
+import pytest
+
+for module in ["numpy", "requests", "xarray", "jupyter_client"]:
+    pytest.importorskip(module)
+
+from load_driver import percentile, response_error  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "response, expected",
+    [
+        ({"uuid": "id", "filename": "a.nc", "status": "ok", "error": None}, None),
+        ({"status": "error", "error": "ConnectionError: refused"}, "ConnectionError: refused"),
+        ({"status": "error", "error": None}, "Request failed"),
+        ({"dataset_create_status": {"id": "id"}, "file_upload_status": {"id": "id"}, "status": "ok"}, None),
+        (
+            {"dataset_create_status": {"id": "id"}, "file_upload_status": None, "status": "ok"},
+            "Dataset saved without a file upload status",
+        ),
+        ({"dataset_create_status": {"id": "id"}}, "Response has no status: {'dataset_create_status': {'id': 'id'}}"),
+    ],
+)
+def test_response_error(response, expected):
+    assert response_error(response) == expected
+
+
+def test_percentile():
+    values = [5, 1, 4, 2, 3]
+
+    assert percentile(values, 0.5) == 3
+    assert percentile(values, 0.9) == 5
+    assert percentile(values, 0) == 1
+    assert percentile([7], 0.99) == 7
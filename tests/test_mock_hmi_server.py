@@ -0,0 +1,135 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from mock_hmi_server import MockHMIConfig, MockHMIServer, parse_multipart
+
+BOUNDARY = "loadtest-boundary"
+
+
+def multipart_body(fields: dict) -> bytes:
+    body = b""
+    for name, value in fields.items():
+        body += f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"{name}\"".encode()
+        if isinstance(value, bytes):
+            body += f"; filename=\"{name}\"\r\nContent-Type: application/octet-stream".encode()
+        else:
+            value = value.encode()
+        body += b"\r\n\r\n" + value + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+@pytest.fixture
+def start_server():
+    servers = []
+
+    def start(**config):
+        server = MockHMIServer(("127.0.0.1", 0), MockHMIConfig(**config))
+        server.start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def call(server, method, path, body=None, content_type="application/json"):
+    request = urllib.request.Request(f"{server.url}{path}", data=body, method=method)
+    if body is not None:
+        request.add_header("Content-Type", content_type)
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def upload(server, dataset_id, filename, data):
+    return call(
+        server,
+        "PUT",
+        f"/datasets/{dataset_id}/upload-file",
+        multipart_body({"id": dataset_id, "filename": filename, "file": data}),
+        f"multipart/form-data; boundary={BOUNDARY}",
+    )
+
+
+def test_create_upload_and_download(start_server):
+    server = start_server()
+    data = bytes(range(256)) * 1000
+
+    status, body = call(server, "POST", "/datasets", json.dumps({"name": "test"}).encode())
+    assert status == 201
+    dataset_id = json.loads(body)["id"]
+
+    status, body = upload(server, dataset_id, "test.nc", data)
+    assert status == 200
+    assert json.loads(body) == {"id": dataset_id, "filename": "test.nc", "size": len(data)}
+
+    status, body = call(server, "GET", f"/datasets/{dataset_id}/download-file?filename=test.nc")
+    assert status == 200
+    assert body == data
+
+    status, body = call(server, "GET", f"/datasets/{dataset_id}")
+    assert json.loads(body) == {"name": "test", "id": dataset_id}
+
+    stats = json.loads(call(server, "GET", "/_stats")[1])
+    assert stats["datasets"] == 1
+    assert stats["requests"] == {"create-dataset": 1, "upload-file": 1, "download-file": 1, "get-dataset": 1}
+    assert stats["bytes_sent"] >= len(data)
+    assert stats["bytes_received"] >= len(data)
+
+
+def test_missing_datasets_files_and_paths(start_server):
+    server = start_server()
+    dataset_id = server.add_file("seed.nc", b"seed")
+
+    assert call(server, "GET", f"/datasets/{dataset_id}/download-file?filename=seed.nc") == (200, b"seed")
+    assert call(server, "GET", f"/datasets/{dataset_id}/download-file?filename=other.nc")[0] == 404
+    assert call(server, "GET", "/datasets/unknown")[0] == 404
+    assert upload(server, "unknown", "test.nc", b"data")[0] == 404
+    assert call(server, "GET", "/unknown")[0] == 404
+
+
+def test_upload_without_file_is_rejected(start_server):
+    server = start_server()
+    dataset_id = server.add_file("seed.nc", b"seed")
+
+    status, _ = call(server, "PUT", f"/datasets/{dataset_id}/upload-file", b"not multipart", "text/plain")
+
+    assert status == 400
+
+
+def test_injected_errors(start_server):
+    server = start_server(error_rate=1.0, error_status=503)
+    dataset_id = server.add_file("seed.nc", b"seed")
+
+    status, body = call(server, "GET", f"/datasets/{dataset_id}/download-file?filename=seed.nc")
+    assert status == 503
+    assert json.loads(body) == {"error": "Injected failure for download-file"}
+
+    assert upload(server, dataset_id, "test.nc", b"data")[0] == 503
+    assert server.state.datasets[dataset_id]["files"] == {"seed.nc": b"seed"}
+
+    stats = server.state.stats()
+    assert stats["injected_errors"] == {"download-file": 1, "upload-file": 1}
+    # The request body is still read, so the connection stays usable.
+    assert stats["bytes_received"] > 0
+
+
+def test_parse_multipart_keeps_binary_content_intact():
+    data = b"\x00\r\n--" + BOUNDARY.encode() + b"-not-a-delimiter\r\n\xff"
+
+    body = multipart_body({"filename": "a.nc", "file": data})
+
+    fields = parse_multipart(f"multipart/form-data; boundary=\"{BOUNDARY}\"", body)
+
+    assert fields == {"filename": b"a.nc", "file": data}
+
+
+def test_parse_multipart_ignores_other_content_types():
+    assert parse_multipart("application/json", b"{}") == {}
@@ -0,0 +1,105 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+xr = pytest.importorskip("xarray")
+
+from climate_data_utility import overviews  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("OVERVIEW_CACHE_DIR", str(tmp_path / "overviews"))
+    monkeypatch.setattr(overviews, "_fingerprint_cache", {})
+    return tmp_path / "overviews"
+
+
+def make_dataset():
+    return xr.Dataset(
+        {"tas": (("lat", "lon"), np.arange(12, dtype="float64").reshape(3, 4))},
+        coords={"lat": [-1.0, 0.0, 1.0], "lon": [0.0, 1.0, 2.0, 3.0]},
+    )
+
+
+def write_level(cache_dir, fingerprint, aggregation, resolution):
+    level_dir = cache_dir / fingerprint / aggregation
+    level_dir.mkdir(parents=True, exist_ok=True)
+    path = level_dir / f"{float(resolution[0])}_{float(resolution[1])}.nc"
+    path.touch()
+    return path
+
+
+def test_cache_dir_follows_environment(cache_dir, monkeypatch):
+    assert overviews.overview_cache_dir() == cache_dir
+
+    monkeypatch.delenv("OVERVIEW_CACHE_DIR")
+    assert overviews.overview_cache_dir().parts[-2:] == ("beaker_climate_data_utility", "overviews")
+
+
+def test_levels_are_listed_per_fingerprint_and_aggregation(cache_dir):
+    mean_path = write_level(cache_dir, "abc", "mean", (1, 1))
+    write_level(cache_dir, "abc", "max", (2, 2))
+    write_level(cache_dir, "other", "mean", (0.5, 0.5))
+
+    assert overviews.overview_levels("abc", "mean") == {(1.0, 1.0): mean_path}
+    assert overviews.overview_levels("missing", "mean") == {}
+
+
+def test_open_overview_picks_the_coarsest_detailed_enough_level(cache_dir, monkeypatch):
+    dataset = make_dataset()
+    fingerprint = overviews.dataset_fingerprint(dataset)
+    for resolution in [(0.5, 0.5), (1, 1), (2, 2)]:
+        write_level(cache_dir, fingerprint, "mean", resolution)
+    opened = []
+    monkeypatch.setattr(overviews.xr, "open_dataset", lambda path: opened.append(path.name) or dataset)
+
+    overviews.open_overview(dataset, 1.5, "mean")
+    assert opened == ["1.0_1.0.nc"]
+
+    assert overviews.open_overview(dataset, 0.25, "mean") is dataset
+    assert opened == ["1.0_1.0.nc"]
+
+
+def test_regrid_reuses_exact_levels_and_always_starts_from_the_full_dataset(cache_dir, monkeypatch):
+    dataset = make_dataset()
+    sources = []
+
+    def regrid(source, resolution):
+        sources.append(source)
+        return source.isel(lat=slice(0, 1))
+
+    monkeypatch.setattr(xr.Dataset, "to_netcdf", lambda self, path: path.write_bytes(b"overview"))
+    opened = []
+    monkeypatch.setattr(overviews.xr, "open_dataset", lambda path: opened.append(path.name) or dataset)
+
+    levels = overviews.build_overview_pyramid(dataset, [2, 1], "mean", regrid)
+    assert sorted(levels) == [(1.0, 1.0), (2.0, 2.0)]
+    assert all(source is dataset for source in sources)
+    assert not list(cache_dir.rglob("*.tmp"))
+
+    overviews.regrid_with_overviews(dataset, (2, 2), "mean", regrid)
+    assert len(sources) == 2
+    assert opened == ["2.0_2.0.nc"]
+
+
+def test_fingerprint_changes_with_coordinates_and_values():
+    dataset = make_dataset()
+    fingerprint = overviews.dataset_fingerprint(dataset)
+
+    assert overviews.dataset_fingerprint(dataset) == fingerprint
+    assert overviews.dataset_fingerprint(make_dataset()) == fingerprint
+    assert overviews.dataset_fingerprint(dataset.assign_coords(lon=dataset.lon + 1)) != fingerprint
+    assert overviews.dataset_fingerprint(dataset.roll(lon=1, roll_coords=False)) != fingerprint
+
+
+def test_fingerprint_of_file_data_uses_the_values_once_loaded(tmp_path):
+    pytest.importorskip("scipy")
+    path = tmp_path / "data.nc"
+    make_dataset().to_netcdf(path, engine="scipy")
+
+    with xr.open_dataset(path, engine="scipy") as dataset:
+        lazy_fingerprint = overviews.dataset_fingerprint(dataset)
+        assert overviews.dataset_fingerprint(dataset.roll(lon=1, roll_coords=False)) != lazy_fingerprint
+
+        dataset.load()
+        dataset["tas"].values = dataset["tas"].values * 2
+        assert overviews.dataset_fingerprint(dataset) != lazy_fingerprint